@@ -1,25 +1,34 @@
 import asyncio
 import random
 import tempfile
+import time
 import os
-import base64
+import shutil
+from pathlib import Path
+from typing import Callable, Optional, Tuple
 
 import streamlit as st
 from dotenv import load_dotenv
+from langchain_core.vectorstores import VectorStore
 
+from ragbase.cache import content_key, load_or_create_store, text_key
 from ragbase.chain import ask_question, create_chain
 from ragbase.config import Config
 from ragbase.ingestor import Ingestor
 from ragbase.model import create_llm
 from ragbase.retriever import create_retriever
-from ragbase.uploader import upload_files
+from ragbase.uploader import COPY_BUFFER_SIZE, upload_files
 
-from ragbase.scrapper import summarize_text_for_search, fetch_wikipedia_summary, clean_search_query,fetch_top_wikipedia_results
+from ragbase.scrapper import summarize_text_for_search, fetch_wikipedia_summary, clean_search_query,fetch_top_wikipedia_results, WikipediaUnavailableError
 from langchain_core.documents import Document
-from ragbase.pdf_maker import save_summary_as_pdf,save_wikipedia_results_to_pdf
+from ragbase.pdf_maker import display_pdf_demo, save_summary_as_pdf,save_wikipedia_results_to_pdf
 
 load_dotenv()
 
+STREAM_FLUSH_TOKENS = 8
+STREAM_FLUSH_INTERVAL = 0.05
+WIKIPEDIA_CACHE_TTL = 24 * 60 * 60
+
 LOADING_MESSAGES = [
     "Calculating your answer through multiverse...",
     "Adjusting quantum entanglement...",
@@ -35,30 +44,43 @@ LOADING_MESSAGES = [
 
 
 @st.cache_resource(show_spinner=False)
-def build_qa_chain_from_pdf(files):
-    file_paths = upload_files(files)
-    vector_store = Ingestor().ingest(file_paths)
+def get_ingestor() -> Ingestor:
+    return Ingestor()
+
+
+@st.cache_resource(show_spinner=False, max_entries=Config.Database.MAX_OPEN_STORES)
+def create_qa_chain(key: str, store_id: int, _vector_store: VectorStore):
     llm = create_llm()
-    retriever = create_retriever(llm, vector_store=vector_store)
+    retriever = create_retriever(llm, vector_store=_vector_store)
     return create_chain(llm, retriever)
 
 
-@st.cache_resource
-def build_qa_chain_from_text(user_input):
-    if isinstance(user_input, str) and not user_input.lower().endswith(".pdf"):
+def load_qa_chain(key: str, create_store: Callable[[Path], VectorStore]):
+    vector_store = load_or_create_store(key, create_store)
+    return create_qa_chain(key, id(vector_store), vector_store)
 
-        loaded_documents = [Document(page_content=user_input)]
-    else:
-        loaded_documents = Ingestor().ingest([user_input])
 
-    ingestor = Ingestor()
-    vector_store = ingestor.ingest_from_documents(loaded_documents) \
-        if hasattr(ingestor, "ingest_from_documents") else None
+def upload_key(files) -> str:
+    keys = st.session_state.setdefault("upload_keys", {})
+    file_ids = tuple(file.file_id for file in files)
+    if file_ids not in keys:
+        keys[file_ids] = content_key(files)
+    return keys[file_ids]
 
-    llm = create_llm()
-    retriever = create_retriever(llm, vector_store=vector_store) if vector_store else create_retriever(llm)
-    chain = create_chain(llm, retriever)
-    return chain
+
+def build_qa_chain_from_pdf(files):
+    return load_qa_chain(
+        upload_key(files),
+        lambda path: get_ingestor().ingest(upload_files(files), path),
+    )
+
+
+def build_qa_chain_from_text(user_input: str):
+    documents = [Document(page_content=user_input)]
+    return load_qa_chain(
+        text_key(user_input),
+        lambda path: get_ingestor().ingest_from_documents(documents, path),
+    )
 
 
 async def ask_chain(question: str, chain):
@@ -70,12 +92,24 @@ async def ask_chain(question: str, chain):
         message_placeholder = st.empty()
         message_placeholder.status(random.choice(LOADING_MESSAGES), state="running")
         documents = []
+        pending_tokens = 0
+        last_flush = time.monotonic()
         async for event in ask_question(chain, question, session_id="session-id-42"):
-            if type(event) is str:
+            if isinstance(event, str):
                 full_response += event
-                message_placeholder.markdown(full_response)
-            if type(event) is list:
+                pending_tokens += 1
+                now = time.monotonic()
+                if (
+                    pending_tokens >= STREAM_FLUSH_TOKENS
+                    or now - last_flush >= STREAM_FLUSH_INTERVAL
+                ):
+                    message_placeholder.markdown(full_response)
+                    pending_tokens = 0
+                    last_flush = now
+            elif isinstance(event, list):
                 documents.extend(event)
+        if pending_tokens:
+            message_placeholder.markdown(full_response)
         for i, doc in enumerate(documents):
             with st.expander(f"Source #{i+1}"):
                 st.write(doc.page_content)
@@ -83,40 +117,92 @@ async def ask_chain(question: str, chain):
     st.session_state.messages.append({"role": "assistant", "content": full_response})
 
 
-def display_pdf_demo(pdf_path):
+def current_llm_name() -> str:
+    return Config.Model.LOCAL_LLM if Config.Model.USE_LOCAL else Config.Model.REMOTE_LLM
+
+
+@st.cache_data(show_spinner=False, max_entries=256, persist="disk")
+def summarize_for_search(text_input: str, llm_name: str) -> str:
+    return summarize_text_for_search(text_input, create_llm())
+
+
+@st.cache_data(show_spinner=False, max_entries=256, ttl=WIKIPEDIA_CACHE_TTL)
+def search_wikipedia(query: str, n: int, sentences: int):
+    return fetch_top_wikipedia_results(query, n=n, sentences=sentences, strict=True)
+
+
+def find_wikipedia_results(query: str, n: int, sentences: int) -> Tuple[list, bool]:
     try:
-        with open(pdf_path, "rb") as pdf_file:
-            base64_pdf = base64.b64encode(pdf_file.read()).decode('utf-8')
-        
-        pdf_display = f'''
-        <div style="border: 2px solid #e0e0e0; border-radius: 10px; padding: 10px; background-color: #f9f9f9;">
-            <h4 style="margin-top: 0; color: #333;">📄 PDF Preview - First Page</h4>
-            <iframe 
-                src="data:application/pdf;base64,{base64_pdf}" 
-                width="100%" 
-                height="500" 
-                style="border: 1px solid #ddd; border-radius: 5px;"
-                type="application/pdf">
-            </iframe>
-            <div style="margin-top: 10px; font-size: 0.9em; color: #666;">
-                <strong>File:</strong> {os.path.basename(pdf_path)} | 
-                <strong>Size:</strong> {os.path.getsize(pdf_path) // 1024} KB
-            </div>
-        </div>
-        '''
-        st.markdown(pdf_display, unsafe_allow_html=True)
-        
-        with open(pdf_path, "rb") as file:
-            st.download_button(
-                label="📥 Download Full PDF",
-                data=file,
-                file_name=os.path.basename(pdf_path),
-                mime="application/pdf",
-                use_container_width=True
-            )
+        return search_wikipedia(query, n, sentences), True
+    except WikipediaUnavailableError as e:
+        st.warning("⚠️ Wikipedia could not be fully reached, showing what was found.")
+        return e.results, False
+
+
+def create_wikipedia_pdf(text_input: str, cache_dir: Path) -> Optional[str]:
+    with st.spinner("Summarizing your text for Wikipedia search..."):
+        summary_query = summarize_for_search(text_input, current_llm_name())
+        query = clean_search_query(summary_query)
+        st.info(f"🔍 Searching Wikipedia for: **{query}**")
+
+        results, complete = find_wikipedia_results(query, n=3, sentences=10)
+        print(f"[Debug] Wikipedia results count: {len(results)}")
+
+        if not results:
+            st.warning(f"❌ No Wikipedia page found for your query: **{query}**")
+            st.stop()
+
+        disambig_results = [r for r in results if r.get("is_disambiguation", False)]
+        if disambig_results:
+            disambig_content = disambig_results[0]['content']
+            options = [line.strip("• ").strip() for line in disambig_content.splitlines() if line.startswith("•")]
             
-    except Exception as e:
-        st.error(f"Error displaying PDF demo: {e}")
+            st.warning("⚠️ Multiple possible topics found. Please select one:")
+            selected_option = st.radio("Choose the specific topic to research:", options)
+
+            confirm_clicked = st.button("✅ Confirm Selection", type="primary")
+
+            if not confirm_clicked:
+                st.info("👆 Please confirm your selection to continue")
+                st.stop()
+            
+            st.success(f"✅ You selected: **{selected_option}**")
+
+            with st.spinner(f"Searching for '{selected_option}'..."):
+                results, complete = find_wikipedia_results(selected_option, n=1, sentences=10)
+                if not results:
+                    st.warning(f"❌ No Wikipedia page found for your selected topic: **{selected_option}**")
+                    st.stop()
+
+    with st.spinner("Saving Wikipedia results as PDF..."):
+        pdf_path = None
+        if len(results) == 1:
+            pdf_path = save_summary_as_pdf(
+                title=results[0]['title'],
+                content=results[0]['content'],
+                show_preview=False
+            )
+            st.success(f"📄 Wikipedia summary saved as PDF: `{pdf_path}`")
+
+        else:
+            pdf_path = save_wikipedia_results_to_pdf(
+                query, 
+                top_n=3, 
+                logo_path="images/logo.png",
+                show_preview=False,
+                items=results
+            )
+            if pdf_path:
+                st.success(f"📄 Wikipedia results saved as PDF: `{pdf_path}`")
+            else:
+                st.error("Failed to create PDF from Wikipedia results")
+                st.stop()
+
+    has_content = all(result['content'].strip() for result in results)
+    if pdf_path and complete and has_content and not disambig_results:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copy(pdf_path, cache_dir)
+    return pdf_path
 
 
 def show_input_method():
@@ -149,16 +235,19 @@ def show_input_method():
             st.subheader("📚 Uploaded Documents Preview")
             for i, file in enumerate(uploaded_files):
                 with st.expander(f"📄 Document {i+1}: {file.name}", expanded=(i==0)):
+                    file.seek(0)
                     with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                        tmp_file.write(file.getvalue())
+                        shutil.copyfileobj(file, tmp_file, length=COPY_BUFFER_SIZE)
                         tmp_path = tmp_file.name
-                    
-                    display_pdf_demo(tmp_path)
+                    file.seek(0)
                     
                     try:
-                        os.unlink(tmp_path)
-                    except:
-                        pass
+                        display_pdf_demo(tmp_path)
+                    finally:
+                        try:
+                            os.unlink(tmp_path)
+                        except OSError:
+                            pass
 
         return chain, "pdf"
     
@@ -178,63 +267,13 @@ def show_input_method():
             st.warning("Please enter at least 5 characters of text.")
             st.stop()
 
-        with st.spinner("Summarizing your text for Wikipedia search..."):
-            llm = create_llm()
-            summary_query = summarize_text_for_search(text_input, llm)
-            query = clean_search_query(summary_query)
-            st.info(f"🔍 Searching Wikipedia for: **{query}**")
-
-            results = fetch_top_wikipedia_results(query, n=3, sentences=10)
-            print(f"[Debug] Wikipedia results count: {len(results)}")
-
-            if not results:
-                st.warning(f"❌ No Wikipedia page found for your query: **{query}**")
-                st.stop()
-
-            disambig_results = [r for r in results if r.get("is_disambiguation", False)]
-            if disambig_results:
-                disambig_content = disambig_results[0]['content']
-                options = [line.strip("• ").strip() for line in disambig_content.splitlines() if line.startswith("•")]
-                
-                st.warning("⚠️ Multiple possible topics found. Please select one:")
-                selected_option = st.radio("Choose the specific topic to research:", options)
-
-                confirm_clicked = st.button("✅ Confirm Selection", type="primary")
-
-                if not confirm_clicked:
-                    st.info("👆 Please confirm your selection to continue")
-                    st.stop()
-                
-                st.success(f"✅ You selected: **{selected_option}**")
-
-                with st.spinner(f"Searching for '{selected_option}'..."):
-                    results = fetch_top_wikipedia_results(selected_option, n=1, sentences=10)
-                    if not results:
-                        st.warning(f"❌ No Wikipedia page found for your selected topic: **{selected_option}**")
-                        st.stop()
-
-        with st.spinner("Saving Wikipedia results as PDF..."):
-            pdf_path = None
-            if len(results) == 1:
-                pdf_path = save_summary_as_pdf(
-                    title=results[0]['title'],
-                    content=results[0]['content'],
-                    show_preview=False
-                )
-                st.success(f"📄 Wikipedia summary saved as PDF: `{pdf_path}`")
-
-            else:
-                pdf_path = save_wikipedia_results_to_pdf(
-                    query, 
-                    top_n=3, 
-                    logo_path="images/logo.png",
-                    show_preview=False
-                )
-                if pdf_path:
-                    st.success(f"📄 Wikipedia results saved as PDF: `{pdf_path}`")
-                else:
-                    st.error("Failed to create PDF from Wikipedia results")
-                    st.stop()
+        cache_dir = Config.Path.DATABASE_DIR / f"wiki_{text_key(text_input.strip().lower())}"
+        cached_pdf_path = next(cache_dir.glob("*.pdf"), None)
+        if cached_pdf_path:
+            os.utime(cache_dir)
+            pdf_path = str(cached_pdf_path)
+        else:
+            pdf_path = create_wikipedia_pdf(text_input, cache_dir)
 
         if pdf_path and os.path.exists(pdf_path):
             st.subheader("📘 Wikipedia Summary Preview")
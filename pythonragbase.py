@@ -1,13 +1,16 @@
 import os
-import shutil
 from pathlib import Path
-from ragbase.config import Config
+from ragbase.cache import content_key, load_or_create_store
 from ragbase.chain import ask_question, create_chain
 from ragbase.ingestor import Ingestor
 from ragbase.model import create_llm
 from ragbase.retriever import create_retriever
 from langchain_core.documents import Document
 import asyncio
+import atexit
+
+_LOOP = asyncio.new_event_loop()
+atexit.register(_LOOP.close)
 
 def process_pdf(pdf_path: str):
 
@@ -20,10 +23,12 @@ def process_pdf(pdf_path: str):
     if not pdf_path.lower().endswith('.pdf'):
         raise ValueError("File must be a PDF document")
     
-    shutil.rmtree(Config.Path.DATABASE_DIR, ignore_errors=True)
-    
     file_paths = [Path(pdf_path)]
-    vector_store = Ingestor().ingest(file_paths)
+    with open(pdf_path, "rb") as pdf_file:
+        key = content_key([pdf_file])
+    vector_store = load_or_create_store(
+        key, lambda path: Ingestor().ingest(file_paths, path)
+    )
     llm = create_llm()
     retriever = create_retriever(llm, vector_store=vector_store)
     chain = create_chain(llm, retriever)
@@ -49,7 +54,7 @@ def process_question(question: str, chain):
         
         return full_response, documents
     
-    response, sources = asyncio.run(ask_question_async())
+    response, sources = _LOOP.run_until_complete(ask_question_async())
     
     return {
         "answer": response,
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable
+
+from langchain_core.vectorstores import VectorStore
+from langchain_qdrant import Qdrant
+
+from ragbase.config import Config
+from ragbase.model import create_embeddings
+
+HASH_CHUNK_SIZE = 1024 * 1024
+BUILD_DIR_PREFIX = ".build-"
+STALE_BUILD_SECONDS = 60 * 60
+
+_open_stores: "OrderedDict[str, VectorStore]" = OrderedDict()
+_stores_lock = threading.Lock()
+_key_locks: Dict[str, threading.Lock] = {}
+
+
+def content_key(files: Iterable[BinaryIO]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for file in files:
+        file.seek(0)
+        file_digest = hashlib.blake2b(digest_size=16)
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            file_digest.update(chunk)
+        file.seek(0)
+        digest.update(file_digest.digest())
+    return digest.hexdigest()
+
+
+def text_key(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def load_or_create_store(
+    key: str, create_store: Callable[[Path], VectorStore]
+) -> VectorStore:
+    with _stores_lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _stores_lock:
+            if key in _open_stores:
+                _open_stores.move_to_end(key)
+                return _open_stores[key]
+
+        store_path = Config.Path.DATABASE_DIR / key
+        created = not store_path.exists()
+        if created:
+            _build_store(store_path, create_store)
+        else:
+            os.utime(store_path)
+        vector_store = _open_store(store_path)
+
+        with _stores_lock:
+            _open_stores[key] = vector_store
+            closed_stores = []
+            while len(_open_stores) > Config.Database.MAX_OPEN_STORES:
+                closed_stores.append(_open_stores.popitem(last=False)[1])
+        for closed_store in closed_stores:
+            closed_store.client.close()
+
+        if created:
+            evict_stores()
+        return vector_store
+
+
+def _open_store(store_path: Path) -> VectorStore:
+    return Qdrant.from_existing_collection(
+        embedding=create_embeddings(),
+        collection_name=Config.Database.DOCUMENTS_COLLECTION,
+        path=store_path,
+    )
+
+
+def _build_store(store_path: Path, create_store: Callable[[Path], VectorStore]):
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    build_path = Path(
+        tempfile.mkdtemp(prefix=BUILD_DIR_PREFIX, dir=store_path.parent)
+    )
+    try:
+        create_store(build_path).client.close()
+        os.replace(build_path, store_path)
+    except OSError:
+        shutil.rmtree(build_path, ignore_errors=True)
+        if not store_path.exists():
+            raise
+    except Exception:
+        shutil.rmtree(build_path, ignore_errors=True)
+        raise
+
+
+def evict_stores(max_entries: int = Config.Database.MAX_CACHED_STORES):
+    with _stores_lock:
+        open_keys = set(_open_stores)
+
+    now = time.time()
+    entries = []
+    for entry in Config.Path.DATABASE_DIR.iterdir():
+        if entry.name.startswith(BUILD_DIR_PREFIX):
+            if now - entry.stat().st_mtime > STALE_BUILD_SECONDS:
+                shutil.rmtree(entry, ignore_errors=True)
+        elif entry.is_dir() and entry.name not in open_keys:
+            entries.append(entry)
+
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[max(max_entries - len(open_keys), 0):]:
+        shutil.rmtree(entry, ignore_errors=True)
+
+
+def clear_cache():
+    with _stores_lock:
+        for vector_store in _open_stores.values():
+            vector_store.client.close()
+        _open_stores.clear()
+    shutil.rmtree(Config.Path.DATABASE_DIR, ignore_errors=True)
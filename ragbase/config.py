@@ -11,6 +11,9 @@ class Config:
 
     class Database:
         DOCUMENTS_COLLECTION = "documents"
+        MAX_OPEN_STORES = 4
+        MAX_CACHED_STORES = 20
+        UPSERT_BATCH_SIZE = 64
 
     class Model:
         EMBEDDINGS = "BAAI/bge-base-en-v1.5"
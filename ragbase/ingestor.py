@@ -1,19 +1,91 @@
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Set
 
 from langchain_community.document_loaders import PDFPlumberLoader
-from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
+from langchain_core.documents import Document
 from langchain_core.vectorstores import VectorStore
 from langchain_experimental.text_splitter import SemanticChunker
 from langchain_qdrant import Qdrant
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from ragbase.config import Config
+from ragbase.model import create_embeddings
+
+
+MIN_PAGES_FOR_BOILERPLATE = 3
+BOILERPLATE_EDGE_LINES = 3
+BOILERPLATE_PAGE_SHARE = 0.8
+PAGE_NUMBER = re.compile(r"^(?:page\s+)?(\d{1,4})(?:\s*(?:/|of)\s*\d{1,4})?$", re.IGNORECASE)
+
+
+def _edge_lines(lines: List[str]) -> Set[str]:
+    return set(lines[:BOILERPLATE_EDGE_LINES] + lines[-BOILERPLATE_EDGE_LINES:])
+
+
+def _page_number_offset(line: str, page_index: int) -> Optional[int]:
+    match = PAGE_NUMBER.match(line)
+    return int(match.group(1)) - page_index if match else None
+
+
+def _is_boilerplate(
+    line: str, page_index: int, repeated: Set[str], page_offsets: Set[int]
+) -> bool:
+    return line in repeated or _page_number_offset(line, page_index) in page_offsets
+
+
+def remove_boilerplate(pages: List[str]) -> List[str]:
+    if len(pages) < MIN_PAGES_FOR_BOILERPLATE:
+        return list(pages)
+
+    page_lines = [page.splitlines() for page in pages]
+    page_content = [
+        [(i, line.strip()) for i, line in enumerate(lines) if line.strip()]
+        for lines in page_lines
+    ]
+    page_edges = [_edge_lines([line for _, line in content]) for content in page_content]
+    line_counts = Counter(line for edges in page_edges for line in edges)
+    offset_counts = Counter(
+        offset
+        for page_index, edges in enumerate(page_edges)
+        for offset in {_page_number_offset(line, page_index) for line in edges}
+        if offset is not None
+    )
+    min_pages = BOILERPLATE_PAGE_SHARE * len(pages)
+    repeated = {line for line, count in line_counts.items() if count >= min_pages}
+    page_offsets = {
+        offset for offset, count in offset_counts.items() if count >= min_pages
+    }
+
+    cleaned_pages = []
+    for page_index, (page, lines, content) in enumerate(
+        zip(pages, page_lines, page_content)
+    ):
+        start, end = 0, len(content)
+        while start < min(BOILERPLATE_EDGE_LINES, end) and _is_boilerplate(
+            content[start][1], page_index, repeated, page_offsets
+        ):
+            start += 1
+        while end > max(start, len(content) - BOILERPLATE_EDGE_LINES) and _is_boilerplate(
+            content[end - 1][1], page_index, repeated, page_offsets
+        ):
+            end -= 1
+
+        dropped = {i for i, _ in content[:start] + content[end:]}
+        if not dropped:
+            cleaned_pages.append(page)
+            continue
+        cleaned_pages.append(
+            "\n".join(line for i, line in enumerate(lines) if i not in dropped).strip("\n")
+        )
+    return cleaned_pages
 
 
 class Ingestor:
     def __init__(self):
-        self.embeddings = FastEmbedEmbeddings(model_name=Config.Model.EMBEDDINGS)
+        self.embeddings = create_embeddings()
         self.semantic_splitter = SemanticChunker(
             self.embeddings, breakpoint_threshold_type="interquartile"
         )
@@ -23,19 +95,37 @@ class Ingestor:
             add_start_index=True,
         )
 
-    def ingest(self, doc_paths: List[Path]) -> VectorStore:
-        documents = []
-        for doc_path in doc_paths:
-            loaded_documents = PDFPlumberLoader(doc_path).load()
-            document_text = "\n".join([doc.page_content for doc in loaded_documents])
-            documents.extend(
-                self.recursive_splitter.split_documents(
-                    self.semantic_splitter.create_documents([document_text])
-                )
-            )
+    def ingest(
+        self, doc_paths: List[Path], path: Path = Config.Path.DATABASE_DIR
+    ) -> VectorStore:
+        with ThreadPoolExecutor() as executor:
+            chunk_lists = executor.map(self._load_and_split, doc_paths)
+            documents = [chunk for chunks in chunk_lists for chunk in chunks]
+        return self._store(documents, path)
+
+    def ingest_from_documents(
+        self, documents: List[Document], path: Path = Config.Path.DATABASE_DIR
+    ) -> VectorStore:
+        chunks = []
+        for doc in documents:
+            chunks.extend(self._split(doc.page_content))
+        return self._store(chunks, path)
+
+    def _load_and_split(self, doc_path: Path) -> List[Document]:
+        loaded_documents = PDFPlumberLoader(doc_path).load()
+        pages = remove_boilerplate([doc.page_content for doc in loaded_documents])
+        return self._split("\n".join(pages))
+
+    def _split(self, text: str) -> List[Document]:
+        return self.recursive_splitter.split_documents(
+            self.semantic_splitter.create_documents([text])
+        )
+
+    def _store(self, documents: List[Document], path: Path) -> VectorStore:
         return Qdrant.from_documents(
             documents=documents,
             embedding=self.embeddings,
-            path=Config.Path.DATABASE_DIR,
+            path=path,
             collection_name=Config.Database.DOCUMENTS_COLLECTION,
+            batch_size=Config.Database.UPSERT_BATCH_SIZE,
         )
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from langchain_community.chat_models import ChatOllama
 from langchain_community.document_compressors.flashrank_rerank import FlashrankRerank
 from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
@@ -9,23 +11,35 @@ from ragbase.config import Config
 
 def create_llm() -> BaseLanguageModel:
     if Config.Model.USE_LOCAL:
-        return ChatOllama(
-            model=Config.Model.LOCAL_LLM,
-            temperature=Config.Model.TEMPERATURE,
-            keep_alive="1h",
-            max_tokens=Config.Model.MAX_TOKENS,
-        )
+        return _create_local_llm()
     else:
-        return ChatGroq(
-            temperature=Config.Model.TEMPERATURE,
-            model_name=Config.Model.REMOTE_LLM,
-            max_tokens=Config.Model.MAX_TOKENS,
-        )
+        return _create_remote_llm()
+
+
+@lru_cache(maxsize=1)
+def _create_local_llm() -> BaseLanguageModel:
+    return ChatOllama(
+        model=Config.Model.LOCAL_LLM,
+        temperature=Config.Model.TEMPERATURE,
+        keep_alive="1h",
+        max_tokens=Config.Model.MAX_TOKENS,
+    )
+
+
+@lru_cache(maxsize=1)
+def _create_remote_llm() -> BaseLanguageModel:
+    return ChatGroq(
+        temperature=Config.Model.TEMPERATURE,
+        model_name=Config.Model.REMOTE_LLM,
+        max_tokens=Config.Model.MAX_TOKENS,
+    )
 
 
+@lru_cache(maxsize=1)
 def create_embeddings() -> FastEmbedEmbeddings:
     return FastEmbedEmbeddings(model_name=Config.Model.EMBEDDINGS)
 
 
+@lru_cache(maxsize=1)
 def create_reranker() -> FlashrankRerank:
     return FlashrankRerank(model=Config.Model.RERANKER)
@@ -1,64 +1,152 @@
 from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageTemplate, BaseDocTemplate, Frame
 from ragbase.scrapper import fetch_top_wikipedia_results
 from reportlab.lib.units import inch, mm
 from reportlab.lib.colors import HexColor
+import hashlib
+import io
 import os
-import base64
+import re
+import pypdfium2 as pdfium
 from datetime import datetime
+from functools import lru_cache, partial
 from typing import Union
+from xml.sax.saxutils import escape
 import streamlit as st
 
-class BorderCanvas(canvas.Canvas):
-    def __init__(self, *args, **kwargs):
-        self.border_color = kwargs.pop('border_color', HexColor("#2C3E50"))
-        self.border_width = kwargs.pop('border_width', 2)
-        super().__init__(*args, **kwargs)
+PREVIEW_DPI = 110
+PREVIEW_QUALITY = 80
+MAX_CACHED_PREVIEWS = 4
+PARAGRAPH_BLOCK_LINES = 20
+TITLE_SANITIZER = re.compile(r"[^\w\- ]+")
 
-    def showPage(self):
-        self.draw_border()
-        super().showPage()
+TEMPLATE_STYLES = {
+    "professional": {
+        "title_color": "#2C3E50",
+        "text_color": "#34495E",
+        "accent_color": "#2980B9",
+        "font_name": "Helvetica",
+        "border_color": "#2C3E50"
+    },
+    "modern": {
+        "title_color": "#27AE60",
+        "text_color": "#2C3E50",
+        "accent_color": "#E74C3C",
+        "font_name": "Helvetica",
+        "border_color": "#27AE60"
+    },
+    "elegant": {
+        "title_color": "#8E44AD",
+        "text_color": "#2C3E50",
+        "accent_color": "#16A085",
+        "font_name": "Times-Roman",
+        "border_color": "#8E44AD"
+    }
+}
+
+
+def add_border_canvas(canvas, doc, border_color, border_width):
+    width, height = A4
+    margin = 15
+    canvas.saveState()
+    canvas.setStrokeColor(border_color)
+    canvas.setLineWidth(border_width)
+    canvas.rect(margin, margin, width - 2*margin, height - 2*margin)
+    canvas.restoreState()
+
+
+@lru_cache(maxsize=None)
+def _styles(template_style: str) -> dict:
+    style_config = TEMPLATE_STYLES[template_style]
+    styles = getSampleStyleSheet()
+
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontName=f"{style_config['font_name']}-Bold",
+        fontSize=18,
+        textColor=HexColor(style_config['title_color']),
+        spaceAfter=30,
+        alignment=1
+    )
+
+    subtitle_style = ParagraphStyle(
+        'CustomSubtitle',
+        parent=styles['Normal'],
+        fontName=style_config['font_name'],
+        fontSize=10,
+        textColor=HexColor(style_config['accent_color']),
+        alignment=1
+    )
+
+    content_style = ParagraphStyle(
+        'CustomContent',
+        parent=styles['BodyText'],
+        fontName=style_config['font_name'],
+        fontSize=11,
+        textColor=HexColor(style_config['text_color']),
+        spaceAfter=12,
+        leading=14
+    )
+
+    return {
+        "title": title_style,
+        "subtitle": subtitle_style,
+        "content": content_style
+    }
+
+
+def render_first_page(pdf_data: bytes) -> bytes:
+    key = hashlib.blake2b(pdf_data, digest_size=16).hexdigest()
 
-    def draw_border(self):
-        width, height = A4
-        self.setStrokeColor(self.border_color)
-        self.setLineWidth(self.border_width)
-        margin = 15
-        self.rect(margin, margin, width - 2*margin, height - 2*margin)
+    previews = st.session_state.setdefault("pdf_previews", {})
+    if key in previews:
+        previews[key] = previews.pop(key)
+        return previews[key]
+
+    pdf = pdfium.PdfDocument(pdf_data)
+    try:
+        image = pdf[0].render(scale=PREVIEW_DPI / 72).to_pil()
+    finally:
+        pdf.close()
+    buffer = io.BytesIO()
+    image.save(buffer, "WEBP", quality=PREVIEW_QUALITY)
+    previews[key] = buffer.getvalue()
+    while len(previews) > MAX_CACHED_PREVIEWS:
+        del previews[next(iter(previews))]
+    return previews[key]
 
 def display_pdf_demo(pdf_path):
     try:
         with open(pdf_path, "rb") as pdf_file:
-            base64_pdf = base64.b64encode(pdf_file.read()).decode('utf-8')
-        
-        pdf_display = f'''
-        <div style="border: 2px solid #e0e0e0; border-radius: 10px; padding: 10px; background-color: #f9f9f9;">
-            <h4 style="margin-top: 0; color: #333;">📄 PDF Preview - First Page</h4>
-            <iframe 
-                src="data:application/pdf;base64,{base64_pdf}" 
-                width="100%" 
-                height="500" 
-                style="border: 1px solid #ddd; border-radius: 5px;"
-                type="application/pdf">
-            </iframe>
+            pdf_data = pdf_file.read()
+        file_name = os.path.basename(pdf_path)
+
+        preview = render_first_page(pdf_data)
+
+        st.markdown(
+            '<h4 style="margin-top: 0; color: #333;">📄 PDF Preview - First Page</h4>',
+            unsafe_allow_html=True
+        )
+        st.image(preview, use_column_width=True)
+        st.markdown(
+            f'''
             <div style="margin-top: 10px; font-size: 0.9em; color: #666;">
-                <strong>File:</strong> {os.path.basename(pdf_path)} | 
-                <strong>Size:</strong> {os.path.getsize(pdf_path) // 1024} KB
+                <strong>File:</strong> {file_name} | 
+                <strong>Size:</strong> {len(pdf_data) // 1024} KB
             </div>
-        </div>
-        '''
-        st.markdown(pdf_display, unsafe_allow_html=True)
+            ''',
+            unsafe_allow_html=True
+        )
         
-        with open(pdf_path, "rb") as file:
-            st.download_button(
-                label="📥 Download Full PDF",
-                data=file,
-                file_name=os.path.basename(pdf_path),
-                mime="application/pdf",
-                use_container_width=True
-            )
+        st.download_button(
+            label="📥 Download Full PDF",
+            data=pdf_data,
+            file_name=file_name,
+            mime="application/pdf",
+            use_container_width=True
+        )
             
     except Exception as e:
         st.error(f"Error displaying PDF demo: {e}")
@@ -78,8 +166,7 @@ def save_summary_as_pdf(
 ):
     
     os.makedirs(output_dir, exist_ok=True)
-    safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-    safe_title = safe_title.replace(" ", "_")
+    safe_title = TITLE_SANITIZER.sub("", title).strip().replace(" ", "_")
     pdf_path = os.path.join(output_dir, f"{safe_title}.pdf")
 
     if content_file and os.path.exists(content_file):
@@ -89,31 +176,9 @@ def save_summary_as_pdf(
     if isinstance(content, str):
         content = content.split("\n")
 
-    template_styles = {
-        "professional": {
-            "title_color": "#2C3E50",
-            "text_color": "#34495E",
-            "accent_color": "#2980B9",
-            "font_name": "Helvetica",
-            "border_color": "#2C3E50"
-        },
-        "modern": {
-            "title_color": "#27AE60",
-            "text_color": "#2C3E50",
-            "accent_color": "#E74C3C",
-            "font_name": "Helvetica",
-            "border_color": "#27AE60"
-        },
-        "elegant": {
-            "title_color": "#8E44AD",
-            "text_color": "#2C3E50",
-            "accent_color": "#16A085",
-            "font_name": "Times-Roman",
-            "border_color": "#8E44AD"
-        }
-    }
-
-    style_config = template_styles.get(template_style, template_styles["modern"])
+    if template_style not in TEMPLATE_STYLES:
+        template_style = "modern"
+    style_config = TEMPLATE_STYLES[template_style]
     
     if border_color == "#2C3E50":
         border_color = style_config["border_color"]
@@ -140,19 +205,14 @@ def save_summary_as_pdf(
             id='normal'
         )
         
-        def add_border_canvas(canvas, doc):
-            border_canvas = BorderCanvas(
-                canvas._filename, 
-                canvas._pagesize,
-                border_color=HexColor(border_color),
-                border_width=border_width
-            )
-            return border_canvas
-
         template = PageTemplate(
             id='WithBorder', 
             frames=frame,
-            onPage=add_border_canvas
+            onPage=partial(
+                add_border_canvas,
+                border_color=HexColor(border_color),
+                border_width=border_width
+            )
         )
         
         doc.addPageTemplates([template])
@@ -166,36 +226,10 @@ def save_summary_as_pdf(
             bottomMargin=72
         )
 
-    styles = getSampleStyleSheet()
-
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontName=f"{style_config['font_name']}-Bold",
-        fontSize=18,
-        textColor=HexColor(style_config['title_color']),
-        spaceAfter=30,
-        alignment=1
-    )
-
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Normal'],
-        fontName=style_config['font_name'],
-        fontSize=10,
-        textColor=HexColor(style_config['accent_color']),
-        alignment=1
-    )
-
-    content_style = ParagraphStyle(
-        'CustomContent',
-        parent=styles['BodyText'],
-        fontName=style_config['font_name'],
-        fontSize=11,
-        textColor=HexColor(style_config['text_color']),
-        spaceAfter=12,
-        leading=14
-    )
+    styles = _styles(template_style)
+    title_style = styles["title"]
+    subtitle_style = styles["subtitle"]
+    content_style = styles["content"]
 
     story = []
 
@@ -214,11 +248,18 @@ def save_summary_as_pdf(
     story.append(Paragraph(f"Generated on: {date_str}", subtitle_style))
     story.append(Spacer(1, 30))
 
+    block = []
     for line in content:
-        if line.strip():
-            story.append(Paragraph(line.strip(), content_style))
-        else:
-            story.append(Spacer(1, 12))
+        line = line.strip()
+        if line:
+            block.append(escape(line))
+        if block and (not line or len(block) >= PARAGRAPH_BLOCK_LINES):
+            story.append(Paragraph("<br/>".join(block), content_style))
+            block = []
+            if not line:
+                story.append(Spacer(1, 12))
+    if block:
+        story.append(Paragraph("<br/>".join(block), content_style))
 
     doc.build(story)
     
@@ -241,8 +282,9 @@ def read_content_from_file(file_path: str) -> list:
         print(f"Error reading file {file_path}: {e}")
         return []
     
-def save_wikipedia_results_to_pdf(user_text: str, top_n: int = 3, logo_path="images/logo.png", show_preview: bool = True):
-    items = fetch_top_wikipedia_results(user_text, n=top_n, sentences=10)
+def save_wikipedia_results_to_pdf(user_text: str, top_n: int = 3, logo_path="images/logo.png", show_preview: bool = True, items=None):
+    if items is None:
+        items = fetch_top_wikipedia_results(user_text, n=top_n, sentences=10)
     if not items:
         print("No Wikipedia results found.")
         return None
@@ -1,9 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+import importlib.util
 import urllib.parse
-import requests
-import wikipedia
-from wikipedia.exceptions import DisambiguationError,PageError
-from bs4 import BeautifulSoup
 import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple
+import logging
+
+if TYPE_CHECKING:
+    import aiohttp
+    import requests
+    from bs4 import BeautifulSoup, SoupStrainer
+
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+WIKIPEDIA_PAGE_URL = "https://en.wikipedia.org/wiki/{}"
+WIKIPEDIA_SUMMARY_URL = "https://en.wikipedia.org/api/rest_v1/page/summary/{}"
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+CITATION_MARK = re.compile(r"\[\d+\]")
+MIN_LEAD_SUMMARY_LENGTH = 100
+TITLE_MAX_WORDS = 4
+NON_TITLE_CHARS = '?,"\''
+ARTICLE_BODY = "#mw-content-text > .mw-parser-output"
+DISAMBIGUATION_OPTION_SELECTORS = [
+    "div.mw-parser-output > ul > li > a[href^='/wiki/']",
+    "div.mw-parser-output > p > a[href^='/wiki/']",
+    "div.mw-parser-output > p + ul li a[href^='/wiki/']"
+]
+DISAMBIGUATION_CATEGORIES = [
+    "/wiki/Category:All_disambiguation_pages",
+    "/wiki/Category:Disambiguation_pages"
+]
+SEARCH_PHRASE_PREFIX = re.compile(
+    r"^(Sure, here is the search phrase:|Search phrase:|Here(?:'s| is) the (?:search )?phrase:)\s*",
+    re.IGNORECASE
+)
+MARKDOWN_EMPHASIS = re.compile(r"[*_`]+")
+FALLBACK_TEMPLATE = """Wikipedia content for '{query}' is currently unavailable. 
+
+This may be due to:
+• Network connectivity issues
+• Wikipedia API limitations  
+• The page not existing
+
+Please try:
+1. Checking your internet connection
+2. Using a different search term
+3. Trying again later
+
+In the meantime, you can visit Wikipedia directly: https://en.wikipedia.org/wiki/{slug}"""
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+log = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+    session.mount('https://', HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=Retry(total=1, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+    ))
+    atexit.register(session.close)
+    return session
+
+@lru_cache(maxsize=1)
+def article_content() -> SoupStrainer:
+    from bs4 import SoupStrainer
+    return SoupStrainer("div", id="mw-content-text")
+
+def parse_html(markup: bytes, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(markup, HTML_PARSER, parse_only=parse_only)
+
+
+class WikipediaUnavailableError(Exception):
+    def __init__(self, message: str, results=()):
+        super().__init__(message)
+        self.results = list(results)
+
+
+class WikipediaResult(NamedTuple):
+    title: str
+    content: str
+    source_url: str
+    is_disambiguation: bool = False
+
 
 def summarize_text_for_search(text, llm):
     prompt = f"""
@@ -29,9 +121,9 @@ def clean_search_query(raw_text: str) -> str:
     if not raw_text:
         return ""
     
-    text = re.sub(r"^(Sure, here is the search phrase:|Search phrase:|Here(?:'s| is) the (?:search )?phrase:)\s*", "", raw_text, flags=re.IGNORECASE)
+    text = SEARCH_PHRASE_PREFIX.sub("", raw_text)
     
-    text = re.sub(r"[*_`]+", "", text)
+    text = MARKDOWN_EMPHASIS.sub("", text)
     
     lines = [line.strip() for line in text.splitlines() if line.strip()]
     
@@ -44,193 +136,283 @@ def clean_search_query(raw_text: str) -> str:
 def fetch_wikipedia_summary(raw_query: str, sentences: int = 10) -> str:
     query = clean_search_query(raw_query)
     if not query:
-        print(f"⚠️ Empty query after cleaning: '{raw_query}'")
+        log.warning("Empty query after cleaning: '%s'", raw_query)
         return ""
 
-    print(f"[Debug] Cleaned query: '{query}'")
+    log.debug("Cleaned query: '%s'", query)
+
+    try:
+        return _fetch_wikipedia_summary_cached(query, sentences)
+    except WikipediaUnavailableError as e:
+        log.warning("Wikipedia summary not cached: %s", e)
+        return e.results[0] if e.results else ""
+    except Exception as e:
+        log.warning("Wikipedia search error: %s", e)
+        return ""
 
-    safe_title = query.replace(" ", "_")
-    direct_url = f"https://en.wikipedia.org/wiki/{urllib.parse.quote(safe_title)}"
+@lru_cache(maxsize=256)
+def _fetch_wikipedia_summary_cached(query: str, sentences: int) -> str:
+    safe_title, direct_url = wiki_url(query)
+    failures = []
     
-    print(f"[Debug] Checking direct URL: {direct_url}")
+    log.debug("Checking direct URL: %s", direct_url)
     
     try:
-        r = requests.get(direct_url, timeout=10)
-        print(f"[Debug] Direct URL status code: {r.status_code}")
-        
-        if r.status_code == 200:
-            soup = BeautifulSoup(r.text, "html.parser")
-            disambiguation = soup.find("div", {"id": "disambig"})
-            
-            if not disambiguation:
-                try:
-                    page = wikipedia.page(safe_title, auto_suggest=False)
-                    print(f"[Debug] Found direct page: {page.title}")
-                    return wikipedia.summary(page.title, sentences=sentences)
-                except (DisambiguationError, PageError) as e:
-                    print(f"[Debug] Direct page error: {e}")
-                    pass
+        r = fetch_page(direct_url)
+        if r is None:
+            log.debug("No direct page for: %s", query)
+        else:
+            soup = parse_html(r.content)
+            if not is_disambiguation_page(soup):
+                summary = extract_lead_summary(soup, sentences)
+                if len(summary) >= MIN_LEAD_SUMMARY_LENGTH:
+                    log.debug("Found direct page: %s", canonical_title(soup, query))
+                    return summary
+                data = fetch_summary(safe_title)
+                if data and data.get("type") != "disambiguation":
+                    log.debug("Found direct page: %s", data.get('title'))
+                    return first_sentences(data.get("extract", ""), sentences)
+                log.debug("Direct page has no usable summary")
             else:
-                print(f"[Debug] Direct page is a disambiguation page")
+                log.debug("Direct page is a disambiguation page")
     except Exception as e:
-        print(f"⚠️ Direct URL check failed: {e}")
+        log.debug("Direct page check failed: %s", e)
+        failures.append(e)
 
-    try:
-        search_results = wikipedia.search(query)
-        print(f"[Debug] Search results: {search_results}")
-        
-        if not search_results:
-            return ""
+    search_results = search_titles(query, 10)
+    log.debug("Search results: %s", search_results)
 
-        for result in search_results[:1]:
-            try:
-                page = wikipedia.page(result, auto_suggest=False)
-                print(f"[Debug] Using search result: {page.title}")
-                return wikipedia.summary(page.title, sentences=sentences)
-            except (DisambiguationError, PageError) as e:
-                print(f"[Debug] Search result error for '{result}': {e}")
-                continue
+    summary = ""
+    for result in search_results[:1]:
+        data = fetch_summary(result)
+        if not data or data.get("type") == "disambiguation":
+            log.debug("Search result error for '%s': no usable summary", result)
+            continue
+        log.debug("Using search result: %s", data.get('title'))
+        summary = first_sentences(data.get("extract", ""), sentences)
 
-        return ""
-    except Exception as e:
-        print(f"⚠️ Wikipedia search error: {e}")
-        return ""
+    if failures:
+        raise WikipediaUnavailableError(
+            f"Incomplete Wikipedia summary for '{query}'", [summary] if summary else []
+        )
+    if not summary:
+        raise WikipediaUnavailableError(f"No Wikipedia summary for '{query}'")
+    return summary
 
 def fetch_wikipedia_full_text(query: str) -> str | None:
 
-    safe_title = urllib.parse.quote(query.replace(" ", "_"))
-    url = f"https://en.wikipedia.org/wiki/{safe_title}"
+    _, url = wiki_url(query)
     try:
-        resp = requests.get(url, timeout=10)
+        resp = get_session().get(url, timeout=10)
         if resp.status_code != 200:
             return None
-        soup = BeautifulSoup(resp.text, "html.parser")
-        paragraphs = soup.select("div.mw-parser-output > p")
-        text = "\n".join(p.get_text().strip() for p in paragraphs if p.get_text().strip())
+        soup = parse_html(resp.content, article_content())
+        paragraphs = soup.select(f"{ARTICLE_BODY} > p")
+        text = "\n".join(filter(None, (p.get_text().strip() for p in paragraphs)))
         return text.strip() if text else None
     except Exception as e:
-        print(f"⚠️ fetch_wikipedia_full_text error: {e}")
+        log.warning("fetch_wikipedia_full_text error: %s", e)
         return None
     
-def fetch_top_wikipedia_results(query: str, n: int = 3, sentences: int = 10):
+def fetch_top_wikipedia_results(query: str, n: int = 3, sentences: int = 10, strict: bool = False):
 
     if not query or not isinstance(query, str) or query.strip().lower() in ['none', 'null', '']:
-        print(f"[DEBUG] ⚠️ Invalid query: '{query}', using 'artillery' as fallback")
+        log.debug("⚠️ Invalid query: '%s', using 'artillery' as fallback", query)
         query = "artillery"
     
     cleaned_query = query.strip()
+
+    try:
+        results = _fetch_top_wikipedia_results_cached(cleaned_query, n, sentences)
+    except Exception as e:
+        log.debug("Wikipedia fetch error: %s", e)
+        results = e.results if isinstance(e, WikipediaUnavailableError) else []
+        if not results:
+            log.debug("All methods failed, returning fallback content")
+            results = get_fallback_content(cleaned_query)
+        if strict:
+            raise WikipediaUnavailableError(
+                str(e), [result._asdict() for result in results]
+            ) from e
+
+    return [result._asdict() for result in results]
+
+@lru_cache(maxsize=256)
+def _fetch_top_wikipedia_results_cached(cleaned_query: str, n: int, sentences: int):
     results = []
+    failures = []
     
-    print(f"[DEBUG] 🔍 Starting search for: '{cleaned_query}'")
+    log.debug("🔍 Starting search for: '%s'", cleaned_query)
     
-    safe_title = cleaned_query.replace(" ", "_")
-    direct_url = f"https://en.wikipedia.org/wiki/{urllib.parse.quote(safe_title)}"
-    print(f"[DEBUG] 🌐 Direct URL: {direct_url}")
+    safe_title, direct_url = wiki_url(cleaned_query)
+    log.debug("🌐 Direct URL: %s", direct_url)
     
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        r = requests.get(direct_url, timeout=10, headers=headers)
-        print(f"[DEBUG] 📊 Direct URL status: {r.status_code}")
+    executor = ThreadPoolExecutor(max_workers=2)
+    direct_future = None
+    if looks_like_title(cleaned_query):
+        direct_future = executor.submit(fetch_page, direct_url)
+    search_future = executor.submit(search_titles, cleaned_query, n*2)
+    executor.shutdown(wait=False)
+    
+    if direct_future is None:
+        log.debug("Query does not look like a page title, skipping direct URL")
+    else:
+        try:
+            r = direct_future.result()
+            log.debug("📊 Direct page found: %s", r is not None)
         
-        if r.status_code == 200:
-            soup = BeautifulSoup(r.text, "html.parser")
+            if r is not None:
+                soup = parse_html(r.content)
             
-            disambig = (soup.find("table", {"id": "disambigbox"}) or 
-                        soup.find("table", {"class": "metadata plainlinks ambox ambox-content ambox-disambiguation"}) or
-                        "disambiguation" in soup.get_text().lower() or
-                        "may refer to:" in soup.get_text())
-            
-            if disambig:
-                print(f"[DEBUG] ✅ Direct page is a disambiguation page")
-                disambig_content = extract_disambiguation_content(soup, cleaned_query, n)
-                results.append({
-                    "title": f"{cleaned_query} (Disambiguation)",
-                    "content": disambig_content,
-                    "source_url": direct_url,
-                    "is_disambiguation": True
-                })
-                print(f"[DEBUG] ✅ Disambiguation page processed")
-                return results
-            else:
-                try:
-                    page = wikipedia.page(safe_title)
-                    summary = wikipedia.summary(page.title, sentences=sentences)
-                    results.append({
-                        "title": page.title,
-                        "content": summary,
-                        "source_url": page.url,
-                        "is_disambiguation": False
-                    })
-                    print(f"[DEBUG] ✅ Direct page added: {page.title}")
-                    return results
-                except (DisambiguationError, PageError) as e:
-                    print(f"[DEBUG] Direct page error: {e}")
-                    manual_content = extract_manual_content(soup, sentences)
-                    results.append({
-                        "title": cleaned_query,
-                        "content": manual_content,
-                        "source_url": direct_url,
-                        "is_disambiguation": False
-                    })
-                    print(f"[DEBUG] ✅ Manual content extracted")
+                if is_disambiguation_page(soup):
+                    log.debug("✅ Direct page is a disambiguation page")
+                    disambig_content = extract_disambiguation_content(soup, cleaned_query, n)
+                    results.append(WikipediaResult(
+                        f"{cleaned_query} (Disambiguation)",
+                        disambig_content,
+                        direct_url,
+                        is_disambiguation=True
+                    ))
+                    log.debug("✅ Disambiguation page processed")
                     return results
+                else:
+                    summary = extract_lead_summary(soup, sentences)
+                    if len(summary) >= MIN_LEAD_SUMMARY_LENGTH:
+                        title = canonical_title(soup, cleaned_query)
+                        results.append(WikipediaResult(title, summary, direct_url))
+                        log.debug("✅ Direct page added: %s", title)
+                        return results
 
-    except Exception as e:
-        print(f"[DEBUG] ❌ Direct URL check failed: {e}")
+                    data = fetch_summary(safe_title)
+                    if data and data.get("type") != "disambiguation":
+                        result = summary_to_result(data, sentences)
+                        results.append(result)
+                        log.debug("✅ Direct page added: %s", result.title)
+                        return results
+                    else:
+                        log.debug("Direct page has no usable summary")
+                        manual_content = extract_manual_content(soup, sentences)
+                        if manual_content:
+                            results.append(WikipediaResult(cleaned_query, manual_content, direct_url))
+                            log.debug("✅ Manual content extracted")
+                            return results
 
-    try:
-        print(f"[DEBUG] Falling back to search for: '{cleaned_query}'")
-        search_results = wikipedia.search(cleaned_query, results=n*2)
-        print(f"[DEBUG] Search results: {search_results}")
-        
-        if not search_results:
-            print(f"[DEBUG] No search results, trying manual extraction from direct URL")
-            manual_results = manual_extract_from_url(direct_url, cleaned_query, sentences)
-            if manual_results:
-                return manual_results
-            else:
-                return get_fallback_content(cleaned_query)
-        
-        valid_results = [res for res in search_results if '(disambiguation)' not in res.lower()]
-        for res in valid_results[:n]:
+        except Exception as e:
+            log.debug("❌ Direct URL check failed: %s", e)
+            failures.append(e)
+
+    log.debug("Falling back to search for: '%s'", cleaned_query)
+    search_results = search_future.result()
+    log.debug("Search results: %s", search_results)
+    
+    if not search_results:
+        log.debug("No search results, trying manual extraction from direct URL")
+        manual_results = manual_extract_from_url(direct_url, cleaned_query, sentences)
+        if manual_results and not failures:
+            return manual_results
+        raise WikipediaUnavailableError(
+            f"No Wikipedia results for '{cleaned_query}'", manual_results or []
+        )
+    
+    valid_results = [res for res in search_results if '(disambiguation)' not in res.lower()][:n]
+    if valid_results:
+        with ThreadPoolExecutor(max_workers=len(valid_results)) as executor:
+            futures = [
+                executor.submit(fetch_search_result, res, cleaned_query, sentences)
+                for res in valid_results
+            ]
+        for res, future in zip(valid_results, futures):
             try:
-                page = wikipedia.page(res, auto_suggest=False)
-                summary = wikipedia.summary(page.title, sentences=sentences)
-                results.append({
-                    "title": page.title,
-                    "content": summary,
-                    "source_url": page.url,
-                    "is_disambiguation": False
-                })
-                print(f"[DEBUG] Search result added: {page.title}")
-            except DisambiguationError as e:
-                disambig_content = create_simple_disambiguation_content(cleaned_query, e.options[:8])
-                results.append({
-                    "title": f"{res} (Disambiguation)",
-                    "content": disambig_content,
-                    "source_url": f"https://en.wikipedia.org/wiki/{res.replace(' ', '_')}",
-                    "is_disambiguation": True
-                })
-                print(f"[DEBUG] Disambiguation result added: {res}")
+                result = future.result()
             except Exception as e:
-                print(f"[DEBUG] Error with result {res}: {e}")
+                log.debug("Error with result %s: %s", res, e)
+                failures.append(e)
                 continue
-                
-        print(f"[DEBUG] 📦 Final results count: {len(results)}")
-        return results
-        
-    except Exception as e:
-        print(f"[DEBUG] Wikipedia fetch error: {e}")
-    
-    print(f"[DEBUG] All methods failed, returning fallback content")
-    return get_fallback_content(cleaned_query)
+            if result:
+                results.append(result)
+            
+    log.debug("📦 Final results count: %s", len(results))
+    if failures:
+        raise WikipediaUnavailableError(
+            f"Incomplete Wikipedia results for '{cleaned_query}'", results
+        )
+    if not results:
+        raise WikipediaUnavailableError(f"No Wikipedia results for '{cleaned_query}'")
+    return results
+
+def looks_like_title(query: str) -> bool:
+    return bool(query) and len(query.split()) <= TITLE_MAX_WORDS and not any(c in query for c in NON_TITLE_CHARS)
+
+def article_body(soup: BeautifulSoup):
+    return soup.select_one(ARTICLE_BODY) or soup.find('div', class_='mw-parser-output')
+
+def is_disambiguation_page(soup: BeautifulSoup) -> bool:
+    return bool(
+        soup.find(id=["disambigbox", "disambig"]) or
+        soup.find("table", class_="ambox-disambiguation") or
+        soup.find("meta", {"property": "mw:PageProp/disambiguation"}) or
+        soup.find("a", href=DISAMBIGUATION_CATEGORIES)
+    )
+
+def extract_lead_summary(soup: BeautifulSoup, sentences: int = 10) -> str:
+    content_div = article_body(soup)
+    if not content_div:
+        return ""
+
+    paragraphs = []
+    sentence_count = 0
+    for element in content_div.find_all(True, recursive=False):
+        if element.name == 'h2' or 'mw-heading' in element.get('class', []):
+            break
+        if element.name != 'p':
+            continue
+        text = CITATION_MARK.sub("", element.get_text()).strip()
+        if text:
+            paragraphs.append(text)
+            sentence_count += len(SENTENCE_BOUNDARY.split(text))
+            if sentence_count >= sentences:
+                break
+
+    return first_sentences(" ".join(paragraphs), sentences)
+
+def canonical_title(soup: BeautifulSoup, default: str) -> str:
+    link = soup.find('link', {'rel': 'canonical'})
+    if not link or not link.get('href'):
+        return default
+    slug = link['href'].rsplit('/wiki/', 1)[-1]
+    return urllib.parse.unquote(slug).replace('_', ' ')
+
+def fetch_search_result(res: str, query: str, sentences: int = 10) -> WikipediaResult | None:
+    data = fetch_summary(res)
+    if not data:
+        log.debug("No summary for result %s", res)
+        return None
+    if data.get("type") == "disambiguation":
+        source_url = summary_to_result(data).source_url
+        r = fetch_page(source_url)
+        if r is None:
+            log.debug("Disambiguation page missing for result %s", res)
+            return None
+        soup = parse_html(r.content)
+        disambig_content = extract_disambiguation_content(soup, query, 8)
+        log.debug("Disambiguation result added: %s", res)
+        return WikipediaResult(
+            f"{res} (Disambiguation)",
+            disambig_content,
+            source_url,
+            is_disambiguation=True
+        )
+    result = summary_to_result(data, sentences)
+    if not result.content:
+        log.debug("Empty summary for result %s", res)
+        return None
+    log.debug("Search result added: %s", result.title)
+    return result
 
 def extract_manual_content(soup: BeautifulSoup, sentences: int = 10) -> str:
     content_lines = []
     
-    content_div = soup.find('div', {'class': 'mw-parser-output'})
+    content_div = article_body(soup)
     if content_div:
         paragraphs = content_div.find_all(['p', 'h1', 'h2', 'h3'], limit=sentences*2)
         
@@ -260,84 +442,43 @@ def extract_manual_content(soup: BeautifulSoup, sentences: int = 10) -> str:
     return '\n'.join(content_lines[:sentences])
 
 def manual_extract_from_url(url: str, query: str, sentences: int = 10):
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        r = requests.get(url, timeout=10, headers=headers)
-        if r.status_code == 200:
-            soup = BeautifulSoup(r.text, "html.parser")
-            content = extract_manual_content(soup, sentences)
-            return [{
-                "title": query,
-                "content": content,
-                "source_url": url,
-                "is_disambiguation": False
-            }]
-    except Exception as e:
-        print(f"[DEBUG] ❌ Manual extraction failed: {e}")
-    
-    return None
+    r = fetch_page(url)
+    if r is None:
+        return None
+    soup = parse_html(r.content, article_content())
+    content = extract_manual_content(soup, sentences)
+    if not content:
+        log.debug("❌ Manual extraction found no content at %s", url)
+        return None
+    return [WikipediaResult(query, content, url)]
 
 def get_fallback_content(query: str):
-    fallback_content = f"""Wikipedia content for '{query}' is currently unavailable. 
-
-This may be due to:
-• Network connectivity issues
-• Wikipedia API limitations  
-• The page not existing
-
-Please try:
-1. Checking your internet connection
-2. Using a different search term
-3. Trying again later
-
-In the meantime, you can visit Wikipedia directly: https://en.wikipedia.org/wiki/{query.replace(' ', '_')}"""
-
-    return [{
-        "title": query,
-        "content": fallback_content,
-        "source_url": f"https://en.wikipedia.org/wiki/{query.replace(' ', '_')}",
-        "is_disambiguation": False
-    }]
+    slug, url = wiki_url(query)
+    return [WikipediaResult(
+        query,
+        FALLBACK_TEMPLATE.format(query=query, slug=slug),
+        url
+    )]
 
 def extract_disambiguation_content(soup, query, n=8):
     content_lines = []
     
     options = []
     
-    selectors = [
-        "div.mw-parser-output > ul > li > a",
-        "div.mw-parser-output > ul > li",
-        "div.mw-parser-output > p > a",
-        "div.mw-parser-output > p + ul li a"
-    ]
-    
-    for selector in selectors:
-        elements = soup.select(selector)
-        for element in elements:
+    for selector in DISAMBIGUATION_OPTION_SELECTORS:
+        for element in soup.select(selector):
+            if 'disambiguation' in element['href'].lower():
+                continue
             text = element.get_text().strip()
-            href = element.get('href', '')
-            title = element.get('title', '')
             
-            if (text and len(text) > 2 and 
-                not text.lower().endswith('(disambiguation)') and
-                not 'disambiguation' in text.lower() and
-                href.startswith('/wiki/') and
-                'disambiguation' not in href.lower()):
-                
+            if len(text) > 2 and 'disambiguation' not in text.lower():
                 options.append(text)
                 if len(options) >= n * 2:
                     break
         if options:
             break
     
-    seen = set()
-    unique_options = []
-    for opt in options:
-        if opt not in seen and len(unique_options) < n:
-            seen.add(opt)
-            unique_options.append(opt)
+    unique_options = list(dict.fromkeys(options))[:n]
     
     if unique_options:
         content_lines.append(f"'{query}' may refer to:")
@@ -346,12 +487,13 @@ def extract_disambiguation_content(soup, query, n=8):
         content_lines.append("")
         content_lines.append("Please specify your query for more precise results.")
     else:
-        first_para = soup.find('div', {'class': 'mw-parser-output'})
+        first_para = article_body(soup)
         if first_para:
             first_p = first_para.find('p')
             if first_p:
-                text = first_p.get_text()[:500]
-                if len(first_p.get_text()) > 500:
+                page_text = first_p.get_text()
+                text = page_text[:500]
+                if len(page_text) > 500:
                     text += "..."
                 content_lines.append(text)
         else:
@@ -368,4 +510,130 @@ def create_simple_disambiguation_content(query, options):
     content_lines.append("")
     content_lines.append("Please specify your query for more precise results.")
     
-    return "\n".join(content_lines)
\ No newline at end of file
+    return "\n".join(content_lines)
+
+
+def first_sentences(text: str, sentences: int) -> str:
+    return " ".join(SENTENCE_BOUNDARY.split(text.strip())[:sentences])
+
+def summary_to_result(data: dict, sentences: int = 10) -> WikipediaResult:
+    title = data.get("title", "")
+    page_url = data.get("content_urls", {}).get("desktop", {}).get("page")
+    return WikipediaResult(
+        title,
+        first_sentences(data.get("extract", ""), sentences),
+        page_url or wiki_url(title)[1]
+    )
+
+def search_params(query: str, limit: int) -> dict:
+    return {
+        "action": "query",
+        "list": "search",
+        "srsearch": query,
+        "srlimit": limit,
+        "srprop": "",
+        "format": "json"
+    }
+
+def search_result_titles(data: dict) -> list:
+    return [item["title"] for item in data.get("query", {}).get("search", [])]
+
+@lru_cache(maxsize=512)
+def wiki_url(query: str) -> tuple[str, str]:
+    slug = query.replace(" ", "_")
+    return slug, WIKIPEDIA_PAGE_URL.format(urllib.parse.quote(slug))
+
+def summary_url(title: str) -> str:
+    return WIKIPEDIA_SUMMARY_URL.format(urllib.parse.quote(title.replace(" ", "_"), safe=""))
+
+def fetch_page(url: str) -> requests.Response | None:
+    r = get_session().get(url, timeout=10)
+    if r.status_code == 404:
+        return None
+    r.raise_for_status()
+    return r
+
+def fetch_summary(title: str) -> dict | None:
+    r = fetch_page(summary_url(title))
+    return r.json() if r is not None else None
+
+def search_titles(query: str, limit: int) -> list:
+    r = get_session().get(WIKIPEDIA_API_URL, params=search_params(query, limit), timeout=10)
+    r.raise_for_status()
+    return search_result_titles(r.json())
+
+async def fetch_summary_async(session: aiohttp.ClientSession, title: str) -> dict | None:
+    async with session.get(summary_url(title)) as resp:
+        if resp.status == 404:
+            return None
+        resp.raise_for_status()
+        return await resp.json()
+
+async def fetch_page_async(session: aiohttp.ClientSession, url: str) -> bytes | None:
+    async with session.get(url) as resp:
+        if resp.status == 404:
+            return None
+        resp.raise_for_status()
+        return await resp.read()
+
+async def search_titles_async(session: aiohttp.ClientSession, query: str, limit: int) -> list:
+    async with session.get(WIKIPEDIA_API_URL, params=search_params(query, limit)) as resp:
+        resp.raise_for_status()
+        return search_result_titles(await resp.json())
+
+async def fetch_top_wikipedia_results_async(query: str, n: int = 3, sentences: int = 10):
+
+    if not query or not isinstance(query, str) or query.strip().lower() in ['none', 'null', '']:
+        query = "artillery"
+
+    cleaned_query = query.strip()
+
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(limit=10, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout, headers={'User-Agent': USER_AGENT}
+    ) as session:
+        direct, search_results = await asyncio.gather(
+            fetch_summary_async(session, cleaned_query),
+            search_titles_async(session, cleaned_query, n * 2),
+            return_exceptions=True
+        )
+        if isinstance(search_results, BaseException):
+            log.debug("Wikipedia search error: %s", search_results)
+            search_results = []
+
+        if isinstance(direct, dict):
+            if direct.get("type") != "disambiguation":
+                return [summary_to_result(direct, sentences)._asdict()]
+            source_url = summary_to_result(direct).source_url
+            try:
+                page = await fetch_page_async(session, source_url)
+            except Exception as e:
+                log.debug("❌ Disambiguation page fetch failed: %s", e)
+                page = None
+            if page is not None:
+                return [WikipediaResult(
+                    f"{cleaned_query} (Disambiguation)",
+                    extract_disambiguation_content(parse_html(page), cleaned_query, n),
+                    source_url,
+                    is_disambiguation=True
+                )._asdict()]
+
+        valid_results = [res for res in search_results if '(disambiguation)' not in res.lower()][:n]
+        summaries = await asyncio.gather(
+            *(fetch_summary_async(session, res) for res in valid_results),
+            return_exceptions=True
+        )
+
+    results = []
+    for res, summary in zip(valid_results, summaries):
+        if isinstance(summary, BaseException) or not summary:
+            log.debug("Error with result %s: %s", res, summary)
+            continue
+        if summary.get("type") == "disambiguation":
+            continue
+        results.append(summary_to_result(summary, sentences))
+
+    return [result._asdict() for result in results or get_fallback_content(cleaned_query)]
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+from unittest.mock import Mock
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from ragbase import cache
+from ragbase.config import Config
+
+
+class TestEvictStores:
+
+    def make_entry(self, root, name, age):
+        entry = root / name
+        entry.mkdir()
+        mtime = time.time() - age
+        os.utime(entry, (mtime, mtime))
+        return entry
+
+    def setup_database(self, monkeypatch, tmp_path, open_keys=()):
+        monkeypatch.setattr(Config.Path, "DATABASE_DIR", tmp_path)
+        monkeypatch.setattr(
+            cache, "_open_stores", OrderedDict((key, Mock()) for key in open_keys)
+        )
+
+    def test_keeps_most_recently_used_entries(self, monkeypatch, tmp_path):
+        self.setup_database(monkeypatch, tmp_path)
+        for age in range(5):
+            self.make_entry(tmp_path, f"store-{age}", age * 60)
+
+        cache.evict_stores(max_entries=3)
+
+        assert sorted(entry.name for entry in tmp_path.iterdir()) == [
+            "store-0", "store-1", "store-2"
+        ]
+
+    def test_open_stores_are_kept_and_count_towards_limit(self, monkeypatch, tmp_path):
+        self.setup_database(monkeypatch, tmp_path, open_keys=["store-old"])
+        self.make_entry(tmp_path, "store-old", 600)
+        for age in range(3):
+            self.make_entry(tmp_path, f"store-{age}", age * 60)
+
+        cache.evict_stores(max_entries=3)
+
+        assert sorted(entry.name for entry in tmp_path.iterdir()) == [
+            "store-0", "store-1", "store-old"
+        ]
+
+    def test_removes_only_stale_build_folders(self, monkeypatch, tmp_path):
+        self.setup_database(monkeypatch, tmp_path)
+        self.make_entry(tmp_path, ".build-stale", cache.STALE_BUILD_SECONDS + 60)
+        self.make_entry(tmp_path, ".build-running", 60)
+
+        cache.evict_stores(max_entries=3)
+
+        assert [entry.name for entry in tmp_path.iterdir()] == [".build-running"]
@@ -0,0 +1,69 @@
+import os
+import sys
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from ragbase.ingestor import remove_boilerplate
+
+
+class TestRemoveBoilerplate:
+
+    def test_removes_running_header_and_footer(self):
+        pages = [
+            f"ACME Annual Report\nBody text {i} alpha\nBody text {i} beta\nConfidential\nPage {i + 1} of 4"
+            for i in range(4)
+        ]
+
+        cleaned = remove_boilerplate(pages)
+
+        assert cleaned == [f"Body text {i} alpha\nBody text {i} beta" for i in range(4)]
+
+    def test_removes_bare_page_numbers(self):
+        pages = [f"{i + 1}\nChapter text on page {i + 1}." for i in range(3)]
+
+        cleaned = remove_boilerplate(pages)
+
+        assert cleaned == [f"Chapter text on page {i + 1}." for i in range(3)]
+
+    def test_keeps_repeated_body_lines(self):
+        pages = [
+            "FAQ\nQuestion: what is it?\nAnswer:\nA tool.\nQuestion: why?\nAnswer:\nSpeed.",
+            "Question: how?\nAnswer:\nCarefully.\nQuestion: when?\nAnswer:\nTomorrow.",
+            "Question: who?\nAnswer:\nSomeone.\nQuestion: where?\nAnswer:\nThere.",
+        ]
+
+        cleaned = remove_boilerplate(pages)
+
+        assert [page.count("Answer:") for page in cleaned] == [2, 2, 2]
+
+    def test_keeps_numeric_data_lines(self):
+        pages = [
+            "Report\nRevenue grew.\n1",
+            "Costs fell.\n2",
+            "Reporting year\n2024",
+        ]
+
+        cleaned = remove_boilerplate(pages)
+
+        assert cleaned[2].endswith("2024")
+
+    def test_keeps_paragraph_breaks_and_indentation(self):
+        pages = [
+            f"ACME Annual Report\n\nIntro {i}\n\n    Indented body {i}\n\nClosing {i}\n\n{i + 1}"
+            for i in range(3)
+        ]
+
+        cleaned = remove_boilerplate(pages)
+
+        assert cleaned == [
+            f"Intro {i}\n\n    Indented body {i}\n\nClosing {i}" for i in range(3)
+        ]
+
+    def test_pages_without_boilerplate_are_unchanged(self):
+        pages = [f"Intro {i}\n\n  Body {i}\n\nEnd {i}\n" for i in range(3)]
+
+        assert remove_boilerplate(pages) == pages
+
+    def test_short_documents_are_unchanged(self):
+        pages = ["Title\n\n  Intro text\n1", "Title\n\nMore text\n2"]
+
+        assert remove_boilerplate(pages) == pages
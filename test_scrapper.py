@@ -0,0 +1,230 @@
+import asyncio
+import os
+import sys
+from unittest.mock import Mock, patch
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from ragbase import scrapper
+from ragbase.scrapper import (
+    canonical_title,
+    extract_lead_summary,
+    fetch_top_wikipedia_results_async,
+    fetch_wikipedia_summary,
+    first_sentences,
+    parse_html,
+    summary_url,
+)
+
+ARTICLE_HTML = b"""<!DOCTYPE html>
+<html><head>
+<meta charset="utf-8">
+<link rel="canonical" href="https://en.wikipedia.org/wiki/Caf%C3%A9_au_lait">
+</head><body>
+<div class="mw-indicators">
+  <div class="mw-indicator" id="mw-indicator-good-star">
+    <div class="mw-parser-output"><span typeof="mw:File"><a href="/wiki/Wikipedia:Good_articles">Good article</a></span></div>
+  </div>
+</div>
+<div id="mw-content-text" class="mw-body-content">
+  <div class="mw-content-ltr mw-parser-output">
+    <table class="infobox"><tr><td>Infobox text.</td></tr></table>
+    <p class="mw-empty-elt"></p>
+    <p>Caf\xc3\xa9 au lait is a coffee drink.[1] It is made with hot milk.</p>
+    <p>It is popular in France.[2] It is served in a bowl.</p>
+    <div class="mw-heading mw-heading2"><h2 id="History">History</h2></div>
+    <p>The drink dates back centuries.</p>
+  </div>
+</div>
+</body></html>"""
+
+
+class TestFirstSentences:
+
+    def test_keeps_requested_number_of_sentences(self):
+        text = "One. Two! Three? Four."
+
+        assert first_sentences(text, 2) == "One. Two!"
+
+    def test_returns_whole_text_when_shorter(self):
+        assert first_sentences("  Only one sentence.  ", 5) == "Only one sentence."
+
+
+class TestCanonicalTitle:
+
+    def test_reads_title_from_canonical_link(self):
+        soup = parse_html(ARTICLE_HTML)
+
+        assert canonical_title(soup, "default") == "Café au lait"
+
+    def test_falls_back_to_default_without_canonical_link(self):
+        soup = parse_html(b"<html><head></head><body></body></html>")
+
+        assert canonical_title(soup, "default") == "default"
+
+
+class TestExtractLeadSummary:
+
+    def test_reads_lead_from_article_body_not_indicators(self):
+        soup = parse_html(ARTICLE_HTML)
+
+        summary = extract_lead_summary(soup, sentences=10)
+
+        assert summary == (
+            "Café au lait is a coffee drink. It is made with hot milk. "
+            "It is popular in France. It is served in a bowl."
+        )
+
+    def test_stops_at_first_section_heading(self):
+        soup = parse_html(ARTICLE_HTML)
+
+        assert "centuries" not in extract_lead_summary(soup, sentences=10)
+
+    def test_limits_number_of_sentences(self):
+        soup = parse_html(ARTICLE_HTML)
+
+        assert extract_lead_summary(soup, sentences=1) == "Café au lait is a coffee drink."
+
+    def test_returns_empty_string_without_article_body(self):
+        soup = parse_html(b"<html><body><p>Not an article.</p></body></html>")
+
+        assert extract_lead_summary(soup) == ""
+
+
+class TestFetchWikipediaSummary:
+
+    def setup_lookup(self, monkeypatch, fetch_page, search_titles, fetch_summary):
+        scrapper._fetch_wikipedia_summary_cached.cache_clear()
+        monkeypatch.setattr(scrapper, "fetch_page", fetch_page)
+        monkeypatch.setattr(scrapper, "search_titles", search_titles)
+        monkeypatch.setattr(scrapper, "fetch_summary", fetch_summary)
+
+    def test_empty_result_is_retried(self, monkeypatch):
+        search_titles = Mock(return_value=[])
+        self.setup_lookup(monkeypatch, Mock(return_value=None), search_titles, Mock())
+
+        assert fetch_wikipedia_summary("Missing page") == ""
+        assert fetch_wikipedia_summary("Missing page") == ""
+        assert search_titles.call_count == 2
+
+    def test_direct_page_failure_falls_back_to_search(self, monkeypatch):
+        fetch_page = Mock(side_effect=ConnectionError("timeout"))
+        fetch_summary = Mock(return_value={"type": "standard", "extract": "Found it. More."})
+        self.setup_lookup(monkeypatch, fetch_page, Mock(return_value=["Found"]), fetch_summary)
+
+        assert fetch_wikipedia_summary("Found", sentences=1) == "Found it."
+        assert fetch_wikipedia_summary("Found", sentences=1) == "Found it."
+        assert fetch_page.call_count == 2
+
+    def test_successful_summary_is_cached(self, monkeypatch):
+        fetch_summary = Mock(return_value={"type": "standard", "extract": "Found it."})
+        search_titles = Mock(return_value=["Found"])
+        self.setup_lookup(monkeypatch, Mock(return_value=None), search_titles, fetch_summary)
+
+        assert fetch_wikipedia_summary("Found") == "Found it."
+        assert fetch_wikipedia_summary("Found") == "Found it."
+        assert search_titles.call_count == 1
+
+
+DISAMBIGUATION_HTML = b"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body>
+<div id="mw-content-text" class="mw-body-content">
+  <div class="mw-content-ltr mw-parser-output">
+    <p><b>Mercury</b> may refer to:</p>
+    <ul>
+      <li><a href="/wiki/Mercury_(planet)">Mercury (planet)</a>, the closest planet to the Sun</li>
+      <li><a href="/wiki/Mercury_(element)">Mercury (element)</a>, a chemical element</li>
+      <li><a href="/wiki/Mercury_(mythology)">Mercury (mythology)</a>, a Roman god</li>
+    </ul>
+  </div>
+</div>
+</body></html>"""
+
+
+class FakeResponse:
+
+    def __init__(self, status=200, payload=None, body=b""):
+        self.status = status
+        self.payload = payload
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+    async def json(self):
+        return self.payload
+
+    async def read(self):
+        return self.body
+
+
+class FakeSession:
+
+    def __init__(self, pages, search_titles):
+        self.pages = pages
+        self.search_titles = search_titles
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def get(self, url, params=None):
+        if params is not None:
+            assert params["list"] == "search"
+            return FakeResponse(payload={
+                "query": {"search": [{"title": title} for title in self.search_titles]}
+            })
+        return self.pages.get(url, FakeResponse(status=404))
+
+
+class TestFetchTopWikipediaResultsAsync:
+
+    def fetch(self, query, pages, search_titles):
+        session = FakeSession(pages, search_titles)
+        with patch("aiohttp.ClientSession", Mock(return_value=session)), patch("aiohttp.TCPConnector"):
+            return asyncio.run(fetch_top_wikipedia_results_async(query, n=3))
+
+    def test_disambiguation_lists_page_links(self):
+        page_url = "https://en.wikipedia.org/wiki/Mercury"
+        pages = {
+            summary_url("Mercury"): FakeResponse(payload={
+                "type": "disambiguation",
+                "title": "Mercury",
+                "content_urls": {"desktop": {"page": page_url}},
+            }),
+            page_url: FakeResponse(body=DISAMBIGUATION_HTML),
+        }
+
+        results = self.fetch("Mercury", pages, ["Mercury", "Mercury (planet)"])
+
+        assert len(results) == 1
+        assert results[0]["is_disambiguation"] is True
+        assert results[0]["source_url"] == page_url
+        assert "• Mercury (mythology)" in results[0]["content"]
+
+    def test_direct_article_returns_summary(self):
+        pages = {
+            summary_url("Alan Turing"): FakeResponse(payload={
+                "type": "standard",
+                "title": "Alan Turing",
+                "extract": "Alan Turing was a mathematician. He was born in 1912.",
+                "content_urls": {"desktop": {"page": "https://en.wikipedia.org/wiki/Alan_Turing"}},
+            }),
+        }
+
+        results = self.fetch("Alan Turing", pages, ["Alan Turing"])
+
+        assert results == [{
+            "title": "Alan Turing",
+            "content": "Alan Turing was a mathematician. He was born in 1912.",
+            "source_url": "https://en.wikipedia.org/wiki/Alan_Turing",
+            "is_disambiguation": False,
+        }]